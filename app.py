@@ -1,11 +1,91 @@
-from flask import Flask, jsonify, render_template, request
+from flask import Flask, Response, g, has_request_context, jsonify, render_template, request
+from flask.json.provider import DefaultJSONProvider, JSONProvider
 from flask_cors import CORS
 import yfinance as yf
+import numpy as np
+import pandas as pd
+from collections import OrderedDict, deque
+from concurrent.futures import Future, TimeoutError as FutureTimeout
 from datetime import datetime
+import itertools
+import math
+import os
+import queue
+import re
+import sys
+import threading
+import time
 import traceback
+import warnings
 import requests
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def json_default(obj):
+    """Serialize NumPy and pandas values the JSON encoders don't handle natively"""
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, pd.Timestamp):
+        return obj.isoformat()
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f'Object of type {type(obj).__name__} is not JSON serializable')
+
+def replace_nonfinite(obj):
+    """Turn NaN/inf into None, matching orjson's output for the stdlib encoder"""
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if isinstance(obj, dict):
+        return {key: replace_nonfinite(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [replace_nonfinite(value) for value in obj]
+    if isinstance(obj, (np.ndarray, np.floating)):
+        return replace_nonfinite(obj.tolist())
+    return obj
+
+class OrjsonProvider(JSONProvider):
+    """JSON provider backed by orjson, with native NumPy and datetime support"""
+
+    option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS if orjson else 0
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=json_default, option=self.option).decode()
+
+    def dumpb(self, obj):
+        return orjson.dumps(obj, default=json_default, option=self.option)
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.dumpb(obj), mimetype='application/json')
+
+class NumpyJSONProvider(DefaultJSONProvider):
+    """Standard library fallback used when orjson is not installed"""
+
+    sort_keys = False
+
+    @staticmethod
+    def default(obj):
+        try:
+            return json_default(obj)
+        except TypeError:
+            return DefaultJSONProvider.default(obj)
+
+    def dumps(self, obj, **kwargs):
+        return super().dumps(replace_nonfinite(obj), **kwargs)
+
+    def dumpb(self, obj):
+        return self.dumps(obj).encode()
+
 app = Flask(__name__)
+app.json = OrjsonProvider(app) if orjson else NumpyJSONProvider(app)
 CORS(app)
 
 # Indian market stocks (NSE) - Only for default display
@@ -14,8 +94,223 @@ DEFAULT_SYMBOLS = [
     'HINDUNILVR.NS', 'BHARTIARTL.NS', 'ITC.NS', 'SBIN.NS', 'LT.NS'
 ]
 
+# Map chart periods to yfinance parameters
+HISTORY_PERIODS = {
+    '1d': {'period': '1d', 'interval': '5m'},
+    '1w': {'period': '5d', 'interval': '30m'},
+    '1m': {'period': '1mo', 'interval': '1d'},
+    '3m': {'period': '3mo', 'interval': '1d'},
+    '6m': {'period': '6mo', 'interval': '1d'},
+    '1y': {'period': '1y', 'interval': '1d'},
+    '5y': {'period': '5y', 'interval': '1wk'},
+    'max': {'period': 'max', 'interval': '1mo'}
+}
+
+# How long downloaded close series stay fresh (seconds)
+CLOSE_CACHE_TTL = 300
+
+# Daily-bar period used to find each stock's previous close for day change
+DAY_CHANGE_PERIOD = '1m'
+
+# How long a fetched quote is reused by other requests for the same stock (seconds)
+QUOTE_CACHE_TTL = 30
+
+# Bars per year for each yfinance interval, used to annualize volatility
+PERIODS_PER_YEAR = {
+    '5m': 252 * 75,
+    '30m': 252 * 13,
+    '1d': 252,
+    '1wk': 52,
+    '1mo': 12
+}
+
+# Largest universe the analytics endpoint will build a correlation matrix for
+MAX_ANALYTICS_SYMBOLS = 500
+
+# Symbol registry entries (aliases included); symbols beyond this are fetched but not cached
+MAX_INSTRUMENTS = 5000
+
+# How long the homepage snapshot is served from cache (matches the page's refresh interval)
+SNAPSHOT_TTL = 30
+
+# Memory budget for pre-encoded responses (bytes)
+RESPONSE_CACHE_MAX_BYTES = 32 * 1024 * 1024
+
+# Quote fields and comparison operators alert rules can use
+ALERT_FIELDS = ['price', 'change', 'changePercent']
+ALERT_OPERATORS = ['>', '>=', '<', '<=']
+
+# Number of triggered alerts kept for polling and streaming clients
+ALERT_HISTORY_SIZE = 1000
+
+# Rule slots in use before triggered and removed rules are compacted away
+ALERT_COMPACT_MIN = 1024
+
+# Directory for the intraday quote tape. Recording is off unless this is set.
+QUOTE_TAPE_DIR = os.environ.get('QUOTE_TAPE_DIR')
+
+# Fixed-width tape record: 52 bytes per quote
+TAPE_DTYPE = np.dtype([
+    ('timestamp', '<i8'),  # milliseconds since epoch
+    ('symbol', 'S20'),
+    ('price', '<f8'),
+    ('change', '<f8'),
+    ('changePercent', '<f8')
+])
+
+# Upstream priority classes - lower values are served first
+PRIORITY_INTERACTIVE = 0  # stock detail and search
+PRIORITY_CHARTS = 1       # price history
+PRIORITY_BULK = 2         # homepage snapshot, portfolio and analytics downloads
+
+# Threads making calls to Yahoo Finance
+UPSTREAM_WORKERS = 16
+
+# Queued upstream calls allowed per priority class before new requests are shed
+UPSTREAM_QUEUE_LIMITS = {
+    PRIORITY_INTERACTIVE: 64,
+    PRIORITY_CHARTS: 32,
+    PRIORITY_BULK: 32
+}
+
+# Time budget (seconds) for all upstream calls made while serving one request
+UPSTREAM_DEADLINES = {
+    PRIORITY_INTERACTIVE: 5,
+    PRIORITY_CHARTS: 10,
+    PRIORITY_BULK: 20
+}
+
+# Retry-After (seconds) sent with 503 responses when a queue is full
+UPSTREAM_RETRY_AFTER = 2
+
+class UpstreamUnavailable(Exception):
+    """Raised when an upstream call is shed or misses its deadline"""
+
+    def __init__(self, message, status=503, retry_after=None):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+class UpstreamPool:
+    """Fixed set of worker threads running upstream calls in priority order.
+
+    Each priority class has its own queue depth limit so bulk work is shed
+    before it can delay interactive requests, and calls whose deadline has
+    passed by the time a worker picks them up are dropped unrun. Once a call
+    is running it is bounded only by the timeout it passes to its own HTTP
+    request; the pool cannot interrupt it.
+    """
+
+    def __init__(self, workers, queue_limits):
+        self._queue = queue.PriorityQueue()
+        self._queue_limits = queue_limits
+        self._depth = {priority: 0 for priority in queue_limits}
+        self._lock = threading.Lock()
+        self._seq = itertools.count()
+
+        for i in range(workers):
+            threading.Thread(target=self._worker, name=f'upstream-{i}', daemon=True).start()
+
+    def submit(self, priority, deadline, fn, *args, **kwargs):
+        with self._lock:
+            if self._depth[priority] >= self._queue_limits[priority]:
+                raise UpstreamUnavailable('Server is busy, please retry shortly', 503, UPSTREAM_RETRY_AFTER)
+            self._depth[priority] += 1
+
+        future = Future()
+        future.add_done_callback(lambda done: self._cancelled(priority, done))
+        self._queue.put((priority, next(self._seq), deadline, future, fn, args, kwargs))
+        return future
+
+    def _cancelled(self, priority, future):
+        # A call cancelled while queued stops counting against its class
+        # straight away; the worker that later dequeues it skips it
+        if future.cancelled():
+            with self._lock:
+                self._depth[priority] -= 1
+
+    def depth(self):
+        with self._lock:
+            return dict(self._depth)
+
+    def _worker(self):
+        while True:
+            priority, _, deadline, future, fn, args, kwargs = self._queue.get()
+
+            # Cancelled calls were already taken off the depth count
+            if not future.set_running_or_notify_cancel():
+                continue
+
+            with self._lock:
+                self._depth[priority] -= 1
+            if time.monotonic() >= deadline:
+                future.set_exception(UpstreamUnavailable('Upstream request timed out', 504))
+                continue
+
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+
+upstream_pool = UpstreamPool(UPSTREAM_WORKERS, UPSTREAM_QUEUE_LIMITS)
+
+def upstream_deadline(priority):
+    """Deadline shared by every upstream call made while serving the current request.
+
+    Clients can shorten the budget with an X-Request-Timeout header (seconds).
+    """
+    if not has_request_context():
+        return time.monotonic() + UPSTREAM_DEADLINES[priority]
+
+    if 'upstream_deadline' not in g:
+        budget = UPSTREAM_DEADLINES[priority]
+        requested = request.headers.get('X-Request-Timeout', type=float)
+        if requested and requested > 0:
+            budget = min(budget, requested)
+        g.upstream_deadline = time.monotonic() + budget
+
+    return g.upstream_deadline
+
+def submit_upstream(priority, fn, *args, **kwargs):
+    """Queue an upstream call under the current request's deadline"""
+    deadline = upstream_deadline(priority)
+    return upstream_pool.submit(priority, deadline, fn, *args, **kwargs), deadline
+
+def wait_upstream(future, deadline, cancel=True):
+    """Wait for a queued upstream call until the deadline.
+
+    Pass cancel=False for futures shared with other requests.
+    """
+    try:
+        return future.result(timeout=max(0, deadline - time.monotonic()))
+    except FutureTimeout:
+        if cancel:
+            future.cancel()
+        raise UpstreamUnavailable('Upstream request timed out', 504)
+
+def call_upstream(priority, fn, *args, **kwargs):
+    """Run fn on the upstream pool and wait for its result"""
+    future, deadline = submit_upstream(priority, fn, *args, **kwargs)
+    return wait_upstream(future, deadline)
+
+def remaining_time(priority):
+    """Seconds left before the current request's upstream deadline"""
+    return max(0.1, upstream_deadline(priority) - time.monotonic())
+
+def fetch_info(symbol):
+    """Quote info for a symbol.
+
+    yfinance has no per-call timeout for info, so the request deadline only
+    applies while this call is queued. Once running it can hold a worker for
+    yfinance's own 30 second timeout even if the requester has given up.
+    """
+    return yf.Ticker(symbol).info
+
+def fetch_history(symbol, timeout, **params):
+    return yf.Ticker(symbol).history(timeout=timeout, **params)
+
 # Function to search stocks dynamically using Yahoo Finance API
-def search_yahoo_finance(query):
+def search_yahoo_finance(query, timeout=5):
     """Search for Indian stocks using Yahoo Finance API"""
     try:
         url = f"https://query2.finance.yahoo.com/v1/finance/search"
@@ -33,21 +328,36 @@ def search_yahoo_finance(query):
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         }
 
-        response = requests.get(url, params=params, headers=headers, timeout=5)
+        response = requests.get(url, params=params, headers=headers, timeout=timeout)
 
         if response.status_code == 200:
             data = response.json()
             quotes = data.get('quotes', [])
 
-            # Filter for Indian stocks (NSE and BSE)
+            # Filter for Indian stocks (NSE and BSE), one entry per company
+            listed = {symbol_key(quote.get('symbol', '')) for quote in quotes}
             indian_stocks = []
+            seen = set()
             for quote in quotes:
                 symbol = quote.get('symbol', '')
                 # Only include NSE (.NS) and BSE (.BO) stocks
                 if '.NS' in symbol or '.BO' in symbol:
+                    name = quote.get('longname') or quote.get('shortname', symbol)
+                    pair = exchange_pair(symbol_key(symbol))
+
+                    # Listed on both exchanges: keep the NSE entry and alias the BSE one to it
+                    if symbol_key(symbol).endswith('.BO') and pair in listed:
+                        instrument = register_instrument(pair, name, aliases=[symbol])
+                    else:
+                        instrument = register_instrument(symbol, name)
+
+                    if instrument.symbol in seen:
+                        continue
+                    seen.add(instrument.symbol)
+
                     indian_stocks.append({
-                        'symbol': symbol,
-                        'name': quote.get('longname') or quote.get('shortname', symbol)
+                        'symbol': instrument.symbol,
+                        'name': instrument.name or name
                     })
 
             return indian_stocks
@@ -112,6 +422,699 @@ FALLBACK_STOCKS = [
     {'symbol': 'HDFCLIFE.NS', 'name': 'HDFC Life Insurance'},
 ]
 
+# Symbol registry: every alias of a listed company (RELIANCE, reliance.ns,
+# RELIANCE.BO, ...) resolves to one shared Instrument that owns the cached
+# quote and close series, so each company is fetched and stored once.
+class Instrument:
+    """One listed company and the market data cached for it"""
+
+    __slots__ = ('symbol', 'name', 'lock', 'info', 'info_at', 'pending', 'closes')
+
+    def __init__(self, symbol, name=None):
+        self.symbol = sys.intern(symbol)
+        self.name = name
+        self.lock = threading.Lock()
+        self.info = None
+        self.info_at = 0
+        self.pending = {}  # priority -> in-flight info fetch queued at that priority
+        self.closes = {}  # period -> (fetched_at, pd.Series)
+
+_instruments = {}
+_instruments_lock = threading.Lock()
+
+def symbol_key(symbol):
+    """Case-insensitive lookup key for a symbol; bare symbols default to NSE"""
+    key = symbol.strip().upper()
+    if key and '.' not in key and '^' not in key:
+        key += '.NS'
+    return key
+
+def exchange_pair(key):
+    """The same company's key on the other Indian exchange, if any"""
+    base, _, suffix = key.rpartition('.')
+    other = {'NS': 'BO', 'BO': 'NS'}.get(suffix)
+    return f'{base}.{other}' if base and other else None
+
+def register_instrument(symbol, name=None, aliases=()):
+    """Register a symbol (keeping its spelling) and any aliases that refer to it.
+
+    Once the registry holds MAX_INSTRUMENTS entries, new symbols get an
+    unregistered Instrument instead.
+    """
+    key = symbol_key(symbol)
+
+    with _instruments_lock:
+        instrument = _instruments.get(key)
+        if instrument is None:
+            instrument = Instrument(symbol.strip(), name)
+            if len(_instruments) >= MAX_INSTRUMENTS:
+                return instrument
+            _instruments[key] = instrument
+        elif name and not instrument.name:
+            instrument.name = name
+
+        for alias in aliases:
+            if len(_instruments) >= MAX_INSTRUMENTS:
+                break
+            _instruments.setdefault(symbol_key(alias), instrument)
+
+    return instrument
+
+def adopt_instrument(instrument):
+    """Register an instrument that has returned market data, unless its symbol already is.
+
+    Returns the registered instrument, or the one passed in if the registry is full.
+    """
+    key = symbol_key(instrument.symbol)
+
+    with _instruments_lock:
+        registered = _instruments.get(key)
+        if registered is not None:
+            return registered
+        if len(_instruments) >= MAX_INSTRUMENTS:
+            return instrument
+        _instruments[key] = instrument
+
+    return instrument
+
+def resolve_instrument(symbol):
+    """Instrument for any alias of a symbol.
+
+    Unknown symbols get an unregistered Instrument; it joins the registry
+    only once Yahoo Finance returns data for it (see adopt_instrument).
+    """
+    key = symbol_key(symbol)
+
+    with _instruments_lock:
+        instrument = _instruments.get(key)
+        if instrument:
+            return instrument
+
+        # A BSE listing of a company already known on NSE shares its record
+        pair = exchange_pair(key)
+        if key.endswith('.BO') and pair in _instruments:
+            return _instruments[pair]
+
+    return Instrument(key)
+
+def canonical_symbol(symbol):
+    return resolve_instrument(symbol).symbol
+
+def has_price(info):
+    return bool(info.get('currentPrice') or info.get('regularMarketPrice'))
+
+def instrument_info(instrument, priority):
+    """Queue (or reuse) a fetch of an instrument's quote info.
+
+    Returns (future, deadline, fetched), where fetched is True for the caller
+    that queued a new fetch; that caller publishes the quote. Results are
+    reused for QUOTE_CACHE_TTL seconds. A caller shares the most urgent
+    in-flight fetch queued at its own or a more urgent priority, so there is
+    at most one fetch per priority class and an interactive request never
+    waits behind a bulk one.
+    """
+    deadline = upstream_deadline(priority)
+
+    with instrument.lock:
+        if instrument.info is not None and time.time() - instrument.info_at < QUOTE_CACHE_TTL:
+            future = Future()
+            future.set_result(instrument.info)
+            return future, deadline, False
+
+        for pending_priority in sorted(instrument.pending):
+            pending = instrument.pending[pending_priority]
+            # A finished fetch may not have been cleared by its callback yet
+            if pending_priority <= priority and not pending.done():
+                return pending, deadline, False
+
+        future = upstream_pool.submit(priority, deadline, fetch_info, instrument.symbol)
+        instrument.pending[priority] = future
+
+    def store(done):
+        with instrument.lock:
+            if instrument.pending.get(priority) is done:
+                del instrument.pending[priority]
+            if done.cancelled() or done.exception() is not None:
+                return
+            info = done.result()
+            instrument.info = info
+            instrument.info_at = time.time()
+
+        # Symbols without a price are junk lookups and are not kept
+        if has_price(info):
+            adopt_instrument(instrument)
+
+    future.add_done_callback(store)
+    return future, deadline, True
+
+def wait_instrument_info(instrument, priority, future, deadline, fetched):
+    """Wait for a fetch from instrument_info. Returns (info, fetched).
+
+    A shared fetch that was dropped because the request that queued it ran
+    out of time is retried once under this request's own deadline.
+    """
+    try:
+        return wait_upstream(future, deadline, cancel=False), fetched
+    except UpstreamUnavailable as e:
+        if fetched or e.status != 504 or time.monotonic() >= deadline:
+            raise
+
+    future, deadline, fetched = instrument_info(instrument, priority)
+    return wait_upstream(future, deadline, cancel=False), fetched
+
+def get_instrument_info(instrument, priority):
+    """Fetch an instrument's quote info. Returns (info, fetched)."""
+    return wait_instrument_info(instrument, priority, *instrument_info(instrument, priority))
+
+for stock in FALLBACK_STOCKS:
+    register_instrument(stock['symbol'], stock['name'], aliases=[exchange_pair(symbol_key(stock['symbol']))])
+for symbol in DEFAULT_SYMBOLS:
+    register_instrument(symbol, aliases=[exchange_pair(symbol_key(symbol))])
+
+def format_history_times(index, period):
+    """Format history timestamp labels based on the chart period"""
+    if period == '1d':
+        return index.strftime('%H:%M').tolist()
+    elif period in ['1w', '1m', '3m', '6m']:
+        return index.strftime('%d %b').tolist()
+    return index.strftime('%b %Y').tolist()
+
+def build_quote(symbol, info):
+    """Shape the price summary shared by the stock cards and the detail view"""
+    current_price = info.get('currentPrice') or info.get('regularMarketPrice', 0)
+    previous_close = info.get('previousClose', 0)
+
+    change = current_price - previous_close if current_price and previous_close else 0
+    change_percent = (change / previous_close * 100) if previous_close else 0
+
+    return {
+        'symbol': symbol,
+        'name': info.get('longName', symbol),
+        'price': round(current_price, 2) if current_price else 0,
+        'change': round(change, 2),
+        'changePercent': round(change_percent, 2)
+    }
+
+def serialize_history(hist, period):
+    """Turn a yfinance history DataFrame into chart points"""
+    # Convert whole columns at once instead of rounding row by row
+    times = format_history_times(hist.index, period)
+    timestamps = hist.index.as_unit('ms').asi8.tolist()  # For sorting
+    prices = hist[['Close', 'Open', 'High', 'Low']].round(2).to_numpy().tolist()
+    volumes = hist['Volume'].to_numpy(dtype=np.int64).tolist()
+
+    history_data = []
+
+    for time_str, timestamp, (close, open_, high, low), volume in zip(times, timestamps, prices, volumes):
+        history_data.append({
+            'time': time_str,
+            'timestamp': timestamp,
+            'price': close,
+            'open': open_,
+            'high': high,
+            'low': low,
+            'volume': volume
+        })
+
+    return history_data
+
+def search_fallback_stocks(query, limit=10):
+    """Match a query against the local fallback list by symbol prefix or name"""
+    query_upper = query.upper()
+    fallback_results = []
+
+    for stock in FALLBACK_STOCKS:
+        symbol_clean = stock['symbol'].replace('.NS', '').upper()
+        name_upper = stock['name'].upper()
+
+        if symbol_clean.startswith(query_upper) or query_upper in name_upper:
+            fallback_results.append(stock)
+
+        if len(fallback_results) >= limit:
+            break
+
+    return fallback_results
+
+def get_close_series(symbols, period):
+    """Return {canonical symbol: close Series} for the given period, downloading only stale symbols"""
+    now = time.time()
+    result = {}
+    missing = {}
+
+    for symbol in symbols:
+        instrument = resolve_instrument(symbol)
+        with instrument.lock:
+            cached = instrument.closes.get(period)
+        if cached and now - cached[0] < CLOSE_CACHE_TTL:
+            result[instrument.symbol] = cached[1]
+        else:
+            missing[instrument.symbol] = instrument
+
+    if missing:
+        # One batched download for every stale symbol instead of N history() calls
+        data = call_upstream(PRIORITY_BULK, yf.download, list(missing), progress=False, auto_adjust=False,
+                             group_by='column', timeout=remaining_time(PRIORITY_BULK),
+                             **HISTORY_PERIODS[period])
+
+        if data is not None and not data.empty:
+            closes = data['Close']
+            if isinstance(closes, pd.Series):
+                closes = closes.to_frame(next(iter(missing)))
+
+            for symbol, instrument in missing.items():
+                if symbol not in closes.columns:
+                    continue
+                series = closes[symbol].dropna()
+                if series.empty:
+                    continue
+                # Drop timezone so series from different downloads align on wall-clock dates
+                if series.index.tz is not None:
+                    series.index = series.index.tz_localize(None)
+
+                instrument = adopt_instrument(instrument)
+                with instrument.lock:
+                    instrument.closes[period] = (now, series)
+                result[symbol] = series
+
+    return result
+
+def build_price_matrix(symbols, period):
+    """Align cached close series into a date x symbol matrix.
+
+    Returns (dates, symbols, prices) where prices is a float64 array of shape
+    (len(dates), len(symbols)). Gaps are forward filled; values before a
+    symbol's first close stay NaN. Symbols without data are left out.
+    """
+    series = get_close_series(symbols, period)
+    available = [symbol for symbol in dict.fromkeys(map(canonical_symbol, symbols)) if symbol in series]
+
+    if not available:
+        return pd.DatetimeIndex([]), [], np.empty((0, 0))
+
+    frame = pd.concat([series[symbol] for symbol in available], axis=1, keys=available)
+    frame = frame.sort_index().ffill()
+
+    return frame.index, available, frame.to_numpy(dtype=np.float64)
+
+def to_json_list(values, digits=4):
+    """Round an array and turn NaN/inf into None so it serializes as valid JSON"""
+    values = np.asarray(values, dtype=np.float64)
+    rounded = np.round(values, digits).astype(object)
+    rounded[~np.isfinite(values)] = None
+    return rounded.tolist()
+
+def compute_analytics(prices, window, periods_per_year):
+    """Returns, rolling volatility and correlations for a date x symbol price matrix"""
+    returns = prices[1:] / prices[:-1] - 1
+    valid = ~np.isnan(returns)
+    counts = valid.sum(axis=0)
+
+    total_return = prices[-1] / prices[np.argmax(~np.isnan(prices), axis=0), np.arange(prices.shape[1])] - 1
+    window_return = prices[-1] / prices[-window - 1] - 1 if len(prices) > window else np.full(prices.shape[1], np.nan)
+
+    # Rolling windows as a strided view over the returns: (steps, symbols, window)
+    if len(returns) >= window:
+        windows = np.lib.stride_tricks.sliding_window_view(returns, window, axis=0)
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)
+            rolling_volatility = np.nanstd(windows, axis=2, ddof=1) * np.sqrt(periods_per_year)
+    else:
+        rolling_volatility = np.empty((0, prices.shape[1]))
+
+    # Pairwise correlation over each pair's common history, from masked matrix
+    # products: per pair counts, sums, sums of squares and cross products.
+    # Returns are shifted by each symbol's mean first for numerical stability;
+    # correlation does not change under a per-symbol shift.
+    with np.errstate(invalid='ignore', divide='ignore'):
+        means = np.where(counts > 0, np.nansum(returns, axis=0) / counts, 0.0)
+        mask = valid.astype(np.float64)
+        x = np.where(valid, returns - means, 0.0)
+        x2 = x * x
+
+        overlap = mask.T @ mask  # n[i, j]: returns both symbols have
+        sum_i = x.T @ mask       # sum of symbol i over the overlap with j
+        sum_j = mask.T @ x       # sum of symbol j over the overlap with i
+        sq_i = x2.T @ mask
+        sq_j = mask.T @ x2
+        cross = x.T @ x
+
+        covariance = cross - sum_i * sum_j / overlap
+        variance_i = sq_i - sum_i * sum_i / overlap
+        variance_j = sq_j - sum_j * sum_j / overlap
+        correlation = covariance / np.sqrt(variance_i * variance_j)
+    correlation[overlap < 3] = np.nan
+
+    return {
+        'totalReturn': total_return,
+        'windowReturn': window_return,
+        'volatility': rolling_volatility[-1] if len(rolling_volatility) else np.full(prices.shape[1], np.nan),
+        'rollingVolatility': rolling_volatility,
+        'correlation': correlation
+    }
+
+# Pre-encoded JSON response bodies shared between requests, least recently
+# used first: key -> (expires_at, bytes)
+_response_cache = OrderedDict()
+_response_cache_lock = threading.Lock()
+
+def get_cached_response(key):
+    """Return a response from the pre-encoded cache, or None if missing or stale"""
+    with _response_cache_lock:
+        cached = _response_cache.get(key)
+        if cached is None:
+            return None
+        if time.time() >= cached[0]:
+            del _response_cache[key]
+            return None
+        _response_cache.move_to_end(key)
+
+    return app.response_class(cached[1], mimetype='application/json')
+
+def cache_response(key, data, ttl):
+    """Encode data once, store the bytes for ttl seconds and return them as a response"""
+    body = app.json.dumpb(data)
+    now = time.time()
+
+    with _response_cache_lock:
+        _response_cache[key] = (now + ttl, body)
+        _response_cache.move_to_end(key)
+
+        # Drop expired bodies, then the least recently used until under budget
+        for stale in [k for k, (expires_at, _) in _response_cache.items() if expires_at <= now]:
+            del _response_cache[stale]
+        size = sum(len(cached_body) for _, cached_body in _response_cache.values())
+        while size > RESPONSE_CACHE_MAX_BYTES and len(_response_cache) > 1:
+            _, (_, evicted) = _response_cache.popitem(last=False)
+            size -= len(evicted)
+
+    return app.response_class(body, mimetype='application/json')
+
+# Alert rules are stored column-wise in NumPy arrays indexed by slot, so a
+# quote snapshot is checked against every rule with a handful of array ops.
+# Rule ids are never reused; compaction moves active rules to new slots once
+# most slots hold rules that have triggered or been removed.
+_alert_lock = threading.Condition()
+_alert_count = 0  # slots in use
+_alert_next_id = 0
+_alert_slots = {}  # active rule id -> slot
+_alert_symbols = []
+_alert_symbol_ids = {}
+_alert_rules = {
+    'id': np.empty(0, dtype=np.int64),
+    'symbol': np.empty(0, dtype=np.int32),
+    'field': np.empty(0, dtype=np.int8),
+    'operator': np.empty(0, dtype=np.int8),
+    'threshold': np.empty(0, dtype=np.float64),
+    'active': np.empty(0, dtype=bool)
+}
+_triggered_alerts = deque(maxlen=ALERT_HISTORY_SIZE)
+_triggered_alert_seq = 0
+
+def add_alert_rules(rules):
+    """Store alert rules and return their ids. Caller validates the rules."""
+    global _alert_count, _alert_next_id
+
+    with _alert_lock:
+        compact_alert_rules()
+        start = _alert_count
+        end = start + len(rules)
+
+        # Grow storage geometrically so bulk inserts stay amortized O(1)
+        capacity = len(_alert_rules['active'])
+        if end > capacity:
+            new_capacity = max(end, capacity * 2, 1024)
+            for column, values in _alert_rules.items():
+                grown = np.zeros(new_capacity, dtype=values.dtype)
+                grown[:capacity] = values
+                _alert_rules[column] = grown
+
+        ids = list(range(_alert_next_id, _alert_next_id + len(rules)))
+        for i, rule_id, rule in zip(range(start, end), ids, rules):
+            symbol = rule['symbol']
+            if symbol not in _alert_symbol_ids:
+                _alert_symbol_ids[symbol] = len(_alert_symbols)
+                _alert_symbols.append(symbol)
+
+            _alert_rules['id'][i] = rule_id
+            _alert_rules['symbol'][i] = _alert_symbol_ids[symbol]
+            _alert_rules['field'][i] = ALERT_FIELDS.index(rule['field'])
+            _alert_rules['operator'][i] = ALERT_OPERATORS.index(rule['operator'])
+            _alert_rules['threshold'][i] = rule['threshold']
+            _alert_rules['active'][i] = True
+            _alert_slots[rule_id] = i
+
+        _alert_count = end
+        _alert_next_id += len(rules)
+        return ids
+
+def remove_alert_rule(rule_id):
+    """Deactivate an alert rule. Returns False if it was not active."""
+    with _alert_lock:
+        slot = _alert_slots.pop(rule_id, None)
+        if slot is None:
+            return False
+        _alert_rules['active'][slot] = False
+        compact_alert_rules()
+        return True
+
+def compact_alert_rules():
+    """Move active rules to the front once most used slots are inactive.
+
+    Runs in time linear in the slots in use, at most once per that many
+    deactivations, so evaluation cost tracks the active rule count rather than
+    every rule ever created. Caller holds _alert_lock.
+    """
+    global _alert_count
+
+    if _alert_count < ALERT_COMPACT_MIN or len(_alert_slots) * 2 > _alert_count:
+        return
+
+    keep = np.flatnonzero(_alert_rules['active'][:_alert_count])
+    for values in _alert_rules.values():
+        values[:len(keep)] = values[keep]
+    _alert_rules['active'][len(keep):_alert_count] = False
+
+    _alert_count = len(keep)
+    _alert_slots.clear()
+    _alert_slots.update(zip(_alert_rules['id'][:_alert_count].tolist(), range(_alert_count)))
+
+def describe_alert_rule(slot):
+    """Turn a stored rule back into its JSON form"""
+    return {
+        'id': int(_alert_rules['id'][slot]),
+        'symbol': _alert_symbols[_alert_rules['symbol'][slot]],
+        'field': ALERT_FIELDS[_alert_rules['field'][slot]],
+        'operator': ALERT_OPERATORS[_alert_rules['operator'][slot]],
+        'threshold': float(_alert_rules['threshold'][slot])
+    }
+
+def match_alerts(quotes, rules):
+    """Rows of active rules whose condition holds for a quote snapshot.
+
+    rules holds equal-length columns in the _alert_rules layout. Returns (rows,
+    observed values). Caller holds _alert_lock.
+    """
+    # Snapshot matrix: alert symbol id x field, NaN where no quote was seen
+    snapshot = np.full((len(_alert_symbols), len(ALERT_FIELDS)), np.nan)
+    for quote in quotes:
+        symbol_id = _alert_symbol_ids.get(quote['symbol'])
+        if symbol_id is not None:
+            snapshot[symbol_id] = [quote[field] for field in ALERT_FIELDS]
+
+    observed = snapshot[rules['symbol'], rules['field']]
+    thresholds = rules['threshold']
+    operators = rules['operator']
+
+    # NaN compares False, so rules for symbols outside the snapshot never fire
+    fired = np.select(
+        [operators == 0, operators == 1, operators == 2, operators == 3],
+        [observed > thresholds, observed >= thresholds, observed < thresholds, observed <= thresholds],
+        False
+    )
+    fired &= rules['active']
+
+    rows = np.flatnonzero(fired)
+    return rows, observed[rows]
+
+def evaluate_alerts(quotes):
+    """Check every active rule against a quote snapshot and record those that fire.
+
+    Rules are one-shot: a triggered rule is deactivated.
+    """
+    global _triggered_alert_seq
+
+    with _alert_lock:
+        count = _alert_count
+        if not count or not _alert_symbols:
+            return []
+
+        slots, observed = match_alerts(quotes, {column: values[:count] for column, values in _alert_rules.items()})
+        if not len(slots):
+            return []
+
+        _alert_rules['active'][slots] = False
+
+        triggered_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        events = []
+        for slot, value in zip(slots.tolist(), observed.tolist()):
+            _triggered_alert_seq += 1
+            event = describe_alert_rule(slot)
+            del _alert_slots[event['id']]
+            event['ruleId'] = event.pop('id')
+            event['id'] = _triggered_alert_seq
+            event['value'] = value
+            event['triggeredAt'] = triggered_at
+            events.append(event)
+
+        _triggered_alerts.extend(events)
+        compact_alert_rules()
+        _alert_lock.notify_all()
+        return events
+
+def dry_run_alert_state():
+    """Private copy of the active rules for dry runs"""
+    with _alert_lock:
+        active = _alert_rules['active'][:_alert_count]
+        return {column: values[:_alert_count][active] for column, values in _alert_rules.items()}
+
+def dry_run_alerts(quotes, rules):
+    """Evaluate a dry run's copy of the rules, leaving live alert state untouched.
+
+    Returns the number of rules that fired; they are deactivated in the copy only.
+    """
+    with _alert_lock:
+        if not rules['active'].any() or not _alert_symbols:
+            return 0
+        rows, _ = match_alerts(quotes, rules)
+        rules['active'][rows] = False
+        return len(rows)
+
+def get_triggered_alerts(since, timeout=None):
+    """Triggered alerts with a sequence id greater than since, optionally waiting for new ones"""
+    with _alert_lock:
+        if timeout and _triggered_alert_seq <= since:
+            _alert_lock.wait(timeout)
+        return [event for event in _triggered_alerts if event['id'] > since]
+
+# Quote tape: every fetched quote is appended to a daily file of fixed-width
+# records, which is memory-mapped for queries and can be replayed.
+_tape_lock = threading.Lock()
+_tape_file = None
+_tape_day = None
+
+def tape_path(day):
+    return os.path.join(QUOTE_TAPE_DIR, f'quotes-{day}.tape')
+
+def record_quotes(quotes):
+    """Append quotes to today's tape file, rotating at midnight"""
+    global _tape_file, _tape_day
+
+    if not QUOTE_TAPE_DIR or not quotes:
+        return
+
+    now = datetime.now()
+    records = np.zeros(len(quotes), dtype=TAPE_DTYPE)
+    records['timestamp'] = int(now.timestamp() * 1000)
+    records['symbol'] = [quote['symbol'].encode() for quote in quotes]
+    for field in ('price', 'change', 'changePercent'):
+        records[field] = [quote[field] for quote in quotes]
+
+    day = now.strftime('%Y%m%d')
+    with _tape_lock:
+        if day != _tape_day:
+            if _tape_file:
+                _tape_file.close()
+            os.makedirs(QUOTE_TAPE_DIR, exist_ok=True)
+            _tape_file = open(tape_path(day), 'ab')
+            _tape_day = day
+
+        # Whole records in one write, so readers never see a partial record
+        _tape_file.write(records.tobytes())
+        _tape_file.flush()
+
+def read_tape(day):
+    """Memory-map a day's tape, or None if nothing was recorded"""
+    path = tape_path(day)
+    if not os.path.exists(path):
+        return None
+
+    count = os.path.getsize(path) // TAPE_DTYPE.itemsize
+    if not count:
+        return np.zeros(0, dtype=TAPE_DTYPE)
+
+    return np.memmap(path, dtype=TAPE_DTYPE, mode='r', shape=(count,))
+
+def publish_quotes(quotes):
+    """Feed freshly fetched quotes through alerting and the tape recorder"""
+    evaluate_alerts(quotes)
+    record_quotes(quotes)
+
+# State of the running tape replay, if any
+_replay_lock = threading.Lock()
+_replay_stop = threading.Event()
+_replay_status = {'running': False}
+
+def replay_tape(day, speed):
+    """Replay a recorded session at speed x real time for performance testing.
+
+    Each tick runs the CPU side of the quote pipeline: build_quote, snapshot
+    encoding and alert evaluation. Alerts are evaluated as a dry run against a
+    copy of the active rules, and the encoded snapshot is discarded, so live
+    alerts, caches and the tape are left untouched. No upstream calls are made.
+    """
+    started = time.monotonic()
+    alert_state = dry_run_alert_state()
+
+    try:
+        # The file may have been removed since the request checked for it
+        tape = read_tape(day)
+        if tape is None or not len(tape):
+            return
+        timestamps = tape['timestamp']
+
+        # Each distinct timestamp is one snapshot tick
+        tick_starts = np.flatnonzero(np.r_[True, timestamps[1:] != timestamps[:-1]])
+        tick_ends = np.r_[tick_starts[1:], len(tape)]
+        first = timestamps[0]
+
+        for start, end in zip(tick_starts.tolist(), tick_ends.tolist()):
+            due = started + (timestamps[start] - first) / 1000 / speed
+            delay = due - time.monotonic()
+            if delay > 0 and _replay_stop.wait(delay):
+                break
+
+            ticks = tape[start:end]
+            quotes = [build_quote(symbol.decode(), {
+                'currentPrice': price,
+                'previousClose': price - change
+            }) for symbol, price, change in zip(
+                ticks['symbol'].tolist(), ticks['price'].tolist(), ticks['change'].tolist())]
+
+            app.json.dumpb({
+                'stocks': quotes,
+                'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            })
+            fired = dry_run_alerts(quotes, alert_state)
+
+            with _replay_lock:
+                _replay_status['ticks'] += 1
+                _replay_status['quotes'] += len(quotes)
+                _replay_status['alertsFired'] += fired
+                _replay_status['maxLagMs'] = max(_replay_status['maxLagMs'], round(-delay * 1000, 1))
+
+    finally:
+        with _replay_lock:
+            _replay_status['running'] = False
+            _replay_status['elapsed'] = round(time.monotonic() - started, 3)
+
+@app.errorhandler(UpstreamUnavailable)
+def upstream_unavailable(e):
+    response = jsonify({'error': str(e)})
+    response.status_code = e.status
+    if e.retry_after:
+        response.headers['Retry-After'] = str(e.retry_after)
+    return response
+
 @app.route('/')
 def index():
     return render_template('index.html')
@@ -119,21 +1122,13 @@ def index():
 @app.route('/api/stock/<symbol>')
 def get_stock_data(symbol):
     try:
-        ticker = yf.Ticker(symbol.upper())
-        info = ticker.info
+        instrument = resolve_instrument(symbol)
+        info, fetched = get_instrument_info(instrument, PRIORITY_INTERACTIVE)
 
-        current_price = info.get('currentPrice') or info.get('regularMarketPrice', 0)
+        data = build_quote(instrument.symbol, info)
         previous_close = info.get('previousClose', 0)
 
-        change = current_price - previous_close if current_price and previous_close else 0
-        change_percent = (change / previous_close * 100) if previous_close else 0
-
-        data = {
-            'symbol': symbol.upper(),
-            'name': info.get('longName', symbol.upper()),
-            'price': round(current_price, 2) if current_price else 0,
-            'change': round(change, 2),
-            'changePercent': round(change_percent, 2),
+        data.update({
             'previousClose': round(previous_close, 2) if previous_close else 0,
             'open': round(info.get('open', 0), 2),
             'dayHigh': round(info.get('dayHigh', 0), 2),
@@ -143,10 +1138,16 @@ def get_stock_data(symbol):
             'fiftyTwoWeekHigh': round(info.get('fiftyTwoWeekHigh', 0), 2),
             'fiftyTwoWeekLow': round(info.get('fiftyTwoWeekLow', 0), 2),
             'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        }
+        })
+
+        # Quotes served from cache or from another request's fetch were already published
+        if fetched and has_price(info):
+            publish_quotes([data])
 
         return jsonify(data)
 
+    except UpstreamUnavailable:
+        raise
     except Exception as e:
         return jsonify({
             'error': str(e),
@@ -156,35 +1157,48 @@ def get_stock_data(symbol):
 @app.route('/api/stocks/multiple')
 def get_multiple_stocks():
     try:
-        stocks_data = []
+        cached = get_cached_response('snapshot')
+        if cached:
+            return cached
 
+        # Fetch every symbol in parallel on the upstream pool. Fetches are shared
+        # with other requests for the same stock, so they are not cancelled here.
+        pending = []
         for symbol in DEFAULT_SYMBOLS:
+            instrument = resolve_instrument(symbol)
+            pending.append((instrument,) + instrument_info(instrument, PRIORITY_BULK))
+
+        stocks_data = []
+        fetched_quotes = []
+
+        for instrument, future, deadline, fetched in pending:
             try:
-                ticker = yf.Ticker(symbol)
-                info = ticker.info
-
-                current_price = info.get('currentPrice') or info.get('regularMarketPrice', 0)
-                previous_close = info.get('previousClose', 0)
-
-                change = current_price - previous_close if current_price and previous_close else 0
-                change_percent = (change / previous_close * 100) if previous_close else 0
-
-                stocks_data.append({
-                    'symbol': symbol,
-                    'name': info.get('longName', symbol),
-                    'price': round(current_price, 2) if current_price else 0,
-                    'change': round(change, 2),
-                    'changePercent': round(change_percent, 2)
-                })
+                info, fetched = wait_instrument_info(instrument, PRIORITY_BULK, future, deadline, fetched)
+                quote = build_quote(instrument.symbol, info)
+                stocks_data.append(quote)
+                if fetched and has_price(info):
+                    fetched_quotes.append(quote)
             except Exception as e:
-                print(f"Error fetching {symbol}: {e}")
+                print(f"Error fetching {instrument.symbol}: {e}")
                 continue
 
-        return jsonify({
+        # One batch per snapshot: one alert pass and one tape tick
+        if fetched_quotes:
+            publish_quotes(fetched_quotes)
+
+        data = {
             'stocks': stocks_data,
             'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        })
+        }
+
+        # Only a complete snapshot is shared; retry failed symbols on the next request
+        if len(stocks_data) < len(DEFAULT_SYMBOLS):
+            return jsonify(data)
+
+        return cache_response('snapshot', data, SNAPSHOT_TTL)
 
+    except UpstreamUnavailable:
+        raise
     except Exception as e:
         return jsonify({
             'error': str(e),
@@ -196,54 +1210,33 @@ def get_stock_history(symbol):
     """Get historical data for different time periods"""
     try:
         period = request.args.get('period', '1d')  # Default to 1 day
+        since = request.args.get('since', type=int)  # Only bars at or after this timestamp (ms)
 
-        # Map periods to yfinance parameters
-        period_map = {
-            '1d': {'period': '1d', 'interval': '5m'},
-            '1w': {'period': '5d', 'interval': '30m'},
-            '1m': {'period': '1mo', 'interval': '1d'},
-            '3m': {'period': '3mo', 'interval': '1d'},
-            '6m': {'period': '6mo', 'interval': '1d'},
-            '1y': {'period': '1y', 'interval': '1d'},
-            '5y': {'period': '5y', 'interval': '1wk'},
-            'max': {'period': 'max', 'interval': '1mo'}
-        }
-
-        params = period_map.get(period, period_map['1d'])
+        params = HISTORY_PERIODS.get(period, HISTORY_PERIODS['1d'])
 
-        ticker = yf.Ticker(symbol.upper())
-        hist = ticker.history(**params)
+        symbol = canonical_symbol(symbol)
+        hist = call_upstream(PRIORITY_CHARTS, fetch_history, symbol,
+                             remaining_time(PRIORITY_CHARTS), **params)
 
         if hist.empty:
             return jsonify({'error': 'No historical data available'}), 404
 
-        history_data = []
+        # First bar of the full window, so clients syncing a delta can drop older points
+        start = int(hist.index[0].timestamp() * 1000)
 
-        for index, row in hist.iterrows():
-            # Format date based on period
-            if period == '1d':
-                time_str = index.strftime('%H:%M')
-            elif period in ['1w', '1m', '3m', '6m']:
-                time_str = index.strftime('%d %b')
-            else:
-                time_str = index.strftime('%b %Y')
-
-            history_data.append({
-                'time': time_str,
-                'timestamp': int(index.timestamp() * 1000),  # For sorting
-                'price': round(row['Close'], 2),
-                'open': round(row['Open'], 2),
-                'high': round(row['High'], 2),
-                'low': round(row['Low'], 2),
-                'volume': int(row['Volume'])
-            })
+        if since:
+            hist = hist[hist.index >= pd.Timestamp(since, unit='ms', tz='UTC')]
 
         return jsonify({
-            'symbol': symbol.upper(),
+            'symbol': symbol,
             'period': period,
-            'history': history_data
+            'start': start,
+            'since': since,
+            'history': serialize_history(hist, period)
         })
 
+    except UpstreamUnavailable:
+        raise
     except Exception as e:
         return jsonify({
             'error': str(e),
@@ -259,34 +1252,397 @@ def search_suggestions():
         if not query:
             return jsonify({'suggestions': []})
 
-        # First, try Yahoo Finance API for live search
-        suggestions = search_yahoo_finance(query)
+        # First, try Yahoo Finance API for live search. If the upstream pool is
+        # saturated, answer from the local list rather than failing.
+        try:
+            suggestions = call_upstream(PRIORITY_INTERACTIVE, search_yahoo_finance, query,
+                                        remaining_time(PRIORITY_INTERACTIVE))
+        except UpstreamUnavailable:
+            suggestions = []
 
         # If API returns results, use them
         if suggestions:
             return jsonify({'suggestions': suggestions})
 
         # Fallback: search in local Nifty 50 list
-        query_upper = query.upper()
-        fallback_results = []
+        return jsonify({'suggestions': search_fallback_stocks(query)})
 
-        for stock in FALLBACK_STOCKS:
-            symbol_clean = stock['symbol'].replace('.NS', '').upper()
-            name_upper = stock['name'].upper()
+    except Exception as e:
+        return jsonify({
+            'error': str(e),
+            'suggestions': []
+        }), 400
 
-            if symbol_clean.startswith(query_upper) or query_upper in name_upper:
-                fallback_results.append(stock)
+@app.route('/api/portfolio', methods=['POST'])
+def get_portfolio():
+    """Value a set of positions and build their P&L history"""
+    try:
+        payload = request.get_json(silent=True) or {}
+        period = payload.get('period', '1y')
 
-            if len(fallback_results) >= 10:
-                break
+        if period not in HISTORY_PERIODS:
+            return jsonify({'error': f'Unsupported period: {period}'}), 400
+
+        # Merge duplicate symbols into a single position with a weighted cost
+        holdings = {}
+        for position in payload.get('positions', []):
+            symbol = str(position.get('symbol', '')).strip()
+            quantity = float(position.get('quantity', 0))
+            cost = float(position.get('cost', 0))
+
+            if not symbol or not quantity:
+                continue
+
+            symbol = canonical_symbol(symbol)
+
+            held_quantity, held_cost = holdings.get(symbol, (0.0, 0.0))
+            holdings[symbol] = (held_quantity + quantity, held_cost + quantity * cost)
+
+        # Buys and sells that cancel out leave nothing to value
+        holdings = {symbol: held for symbol, held in holdings.items() if held[0]}
+
+        if not holdings:
+            return jsonify({'error': 'No positions provided'}), 400
 
-        return jsonify({'suggestions': fallback_results})
+        dates, symbols, prices = build_price_matrix(list(holdings), period)
+        missing = [symbol for symbol in holdings if symbol not in symbols]
 
+        if not symbols:
+            return jsonify({'error': 'No price data available', 'missing': missing}), 404
+
+        quantities = np.array([holdings[symbol][0] for symbol in symbols])
+        invested = np.array([holdings[symbol][1] for symbol in symbols])
+
+        # Positions only count towards value and cost once the symbol has a price
+        priced = ~np.isnan(prices)
+        values = np.where(priced, prices, 0.0) * quantities
+        portfolio_value = values.sum(axis=1)
+        portfolio_cost = priced.astype(np.float64) @ invested
+        portfolio_pnl = portfolio_value - portfolio_cost
+
+        last_prices = prices[-1]
+
+        # Day change is against the previous daily close, whatever the bar size of the period
+        if HISTORY_PERIODS[period]['interval'] == '1d':
+            daily_symbols, daily_prices = symbols, prices
+        else:
+            _, daily_symbols, daily_prices = build_price_matrix(symbols, DAY_CHANGE_PERIOD)
+        daily_columns = {symbol: i for i, symbol in enumerate(daily_symbols)}
+        previous_closes = np.array([
+            daily_prices[-2, daily_columns[symbol]] if symbol in daily_columns and len(daily_prices) > 1 else np.nan
+            for symbol in symbols
+        ])
+        day_changes = np.nan_to_num((last_prices - previous_closes) * quantities)
+        position_values = values[-1]
+        position_pnl = position_values - invested
+
+        positions_data = []
+        for i, symbol in enumerate(symbols):
+            positions_data.append({
+                'symbol': symbol,
+                'quantity': quantities[i],
+                'cost': round(invested[i] / quantities[i], 2),
+                'price': round(last_prices[i], 2),
+                'value': round(position_values[i], 2),
+                'pnl': round(position_pnl[i], 2),
+                'pnlPercent': round(position_pnl[i] / invested[i] * 100, 2) if invested[i] else 0,
+                'dayChange': round(day_changes[i], 2)
+            })
+
+        total_value = portfolio_value[-1]
+        total_cost = invested.sum()
+        total_pnl = total_value - total_cost
+        day_change = day_changes.sum()
+        previous_value = total_value - day_change
+
+        times = format_history_times(dates, period)
+        timestamps = dates.as_unit('ms').asi8.tolist()
+        history_values = np.round(portfolio_value, 2).tolist()
+        history_pnl = np.round(portfolio_pnl, 2).tolist()
+
+        history_data = []
+        for i in range(len(dates)):
+            history_data.append({
+                'time': times[i],
+                'timestamp': timestamps[i],
+                'value': history_values[i],
+                'pnl': history_pnl[i]
+            })
+
+        return jsonify({
+            'period': period,
+            'positions': positions_data,
+            'missing': missing,
+            'totalValue': round(total_value, 2),
+            'totalCost': round(total_cost, 2),
+            'totalPnl': round(total_pnl, 2),
+            'totalPnlPercent': round(total_pnl / total_cost * 100, 2) if total_cost else 0,
+            'dayChange': round(day_change, 2),
+            'dayChangePercent': round(day_change / previous_value * 100, 2) if previous_value else 0,
+            'history': history_data,
+            'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        })
+
+    except UpstreamUnavailable:
+        raise
     except Exception as e:
         return jsonify({
             'error': str(e),
-            'suggestions': []
+            'traceback': traceback.format_exc()
         }), 400
 
+@app.route('/api/analytics')
+def get_analytics():
+    """Returns, volatility and correlation matrix across a universe of stocks"""
+    try:
+        symbols_arg = request.args.get('symbols', '')
+        period = request.args.get('period', '1y')
+        window = request.args.get('window', 20, type=int)
+        include_series = request.args.get('series', '').lower() in ('1', 'true', 'yes')
+
+        symbols = [s.strip() for s in symbols_arg.split(',') if s.strip()] or DEFAULT_SYMBOLS
+        symbols = list(dict.fromkeys(canonical_symbol(symbol) for symbol in symbols))
+
+        if period not in HISTORY_PERIODS:
+            return jsonify({'error': f'Unsupported period: {period}'}), 400
+        if window < 2:
+            return jsonify({'error': 'Window must be at least 2'}), 400
+        if len(symbols) > MAX_ANALYTICS_SYMBOLS:
+            return jsonify({'error': f'At most {MAX_ANALYTICS_SYMBOLS} symbols are supported'}), 400
+
+        cache_key = ('analytics', tuple(sorted(symbols)), period, window, include_series)
+        cached = get_cached_response(cache_key)
+        if cached:
+            return cached
+
+        dates, available, prices = build_price_matrix(symbols, period)
+
+        if len(dates) < 2:
+            return jsonify({'error': 'Not enough price data available'}), 404
+
+        interval = HISTORY_PERIODS[period]['interval']
+        stats = compute_analytics(prices, window, PERIODS_PER_YEAR[interval])
+
+        total_return = to_json_list(stats['totalReturn'] * 100, 2)
+        window_return = to_json_list(stats['windowReturn'] * 100, 2)
+        volatility = to_json_list(stats['volatility'] * 100, 2)
+
+        stocks_data = []
+        for i, symbol in enumerate(available):
+            stocks_data.append({
+                'symbol': symbol,
+                'returnPercent': total_return[i],
+                'windowReturnPercent': window_return[i],
+                'volatilityPercent': volatility[i]
+            })
+
+        data = {
+            'period': period,
+            'window': window,
+            'symbols': available,
+            'missing': [symbol for symbol in symbols if symbol not in available],
+            'stocks': stocks_data,
+            'correlation': to_json_list(stats['correlation'], 4),
+            'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        }
+
+        if include_series:
+            rolling_dates = dates[window:]
+            data['rolling'] = {
+                'time': format_history_times(rolling_dates, period),
+                'timestamp': rolling_dates.as_unit('ms').asi8.tolist(),
+                'volatilityPercent': to_json_list(stats['rollingVolatility'].T * 100, 2)
+            }
+
+        return cache_response(cache_key, data, CLOSE_CACHE_TTL)
+
+    except UpstreamUnavailable:
+        raise
+    except Exception as e:
+        return jsonify({
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        }), 400
+
+@app.route('/api/alerts', methods=['GET', 'POST'])
+def alerts():
+    """List active alert rules or create new ones"""
+    try:
+        if request.method == 'GET':
+            symbol = request.args.get('symbol', '').strip()
+
+            with _alert_lock:
+                active = np.flatnonzero(_alert_rules['active'][:_alert_count])
+                if symbol:
+                    symbol_id = _alert_symbol_ids.get(canonical_symbol(symbol), -1)
+                    active = active[_alert_rules['symbol'][active] == symbol_id]
+                rules = [describe_alert_rule(slot) for slot in active.tolist()]
+
+            return jsonify({'alerts': rules})
+
+        payload = request.get_json(silent=True) or {}
+        raw_rules = payload.get('rules', [payload])
+
+        rules = []
+        for rule in raw_rules:
+            symbol = str(rule.get('symbol', '')).strip()
+            field = rule.get('field', 'price')
+            operator = rule.get('operator')
+
+            if not symbol:
+                return jsonify({'error': 'Alert symbol is required'}), 400
+            if field not in ALERT_FIELDS:
+                return jsonify({'error': f'Unsupported alert field: {field}'}), 400
+            if operator not in ALERT_OPERATORS:
+                return jsonify({'error': f'Unsupported alert operator: {operator}'}), 400
+
+            rules.append({
+                'symbol': canonical_symbol(symbol),
+                'field': field,
+                'operator': operator,
+                'threshold': float(rule['threshold'])
+            })
+
+        ids = add_alert_rules(rules)
+
+        return jsonify({'ids': ids}), 201
+
+    except Exception as e:
+        return jsonify({
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        }), 400
+
+@app.route('/api/alerts/<int:rule_id>', methods=['DELETE'])
+def delete_alert(rule_id):
+    if not remove_alert_rule(rule_id):
+        return jsonify({'error': 'Alert not found'}), 404
+
+    return jsonify({'id': rule_id, 'deleted': True})
+
+@app.route('/api/alerts/triggered')
+def triggered_alerts():
+    """Poll for alerts triggered after the given sequence id"""
+    since = request.args.get('since', 0, type=int)
+
+    return jsonify({'alerts': get_triggered_alerts(since)})
+
+@app.route('/api/alerts/stream')
+def stream_alerts():
+    """Push triggered alerts to the client as server-sent events"""
+    since = request.args.get('since', _triggered_alert_seq, type=int)
+
+    def generate():
+        last_seen = since
+        while True:
+            events = get_triggered_alerts(last_seen, timeout=15)
+            if not events:
+                yield ': keep-alive\n\n'
+                continue
+            for event in events:
+                yield f"id: {event['id']}\ndata: {app.json.dumps(event)}\n\n"
+            last_seen = events[-1]['id']
+
+    return Response(generate(), mimetype='text/event-stream', headers={'Cache-Control': 'no-cache'})
+
+@app.route('/api/tape')
+def list_tapes():
+    """Days with recorded quotes and their record counts"""
+    if not QUOTE_TAPE_DIR:
+        return jsonify({'error': 'Quote tape recording is disabled'}), 404
+
+    days = []
+    if os.path.isdir(QUOTE_TAPE_DIR):
+        for name in sorted(os.listdir(QUOTE_TAPE_DIR)):
+            match = re.fullmatch(r'quotes-(\d{8})\.tape', name)
+            if match:
+                size = os.path.getsize(os.path.join(QUOTE_TAPE_DIR, name))
+                days.append({'date': match.group(1), 'records': size // TAPE_DTYPE.itemsize})
+
+    return jsonify({'days': days})
+
+@app.route('/api/tape/<symbol>')
+def get_tape(symbol):
+    """Recorded intraday quotes for a symbol"""
+    if not QUOTE_TAPE_DIR:
+        return jsonify({'error': 'Quote tape recording is disabled'}), 404
+
+    day = request.args.get('date', datetime.now().strftime('%Y%m%d'))
+    start = request.args.get('start', type=int)
+    end = request.args.get('end', type=int)
+
+    if not re.fullmatch(r'\d{8}', day):
+        return jsonify({'error': 'Date must be YYYYMMDD'}), 400
+
+    tape = read_tape(day)
+    if tape is None:
+        return jsonify({'error': f'No quotes recorded on {day}'}), 404
+
+    symbol = canonical_symbol(symbol)
+    mask = tape['symbol'] == symbol.encode()
+    if start:
+        mask &= tape['timestamp'] >= start
+    if end:
+        mask &= tape['timestamp'] <= end
+    records = tape[mask]
+
+    return jsonify({
+        'symbol': symbol,
+        'date': day,
+        'timestamp': records['timestamp'],
+        'price': records['price'],
+        'change': records['change'],
+        'changePercent': records['changePercent']
+    })
+
+@app.route('/api/tape/replay', methods=['GET', 'POST', 'DELETE'])
+def tape_replay():
+    """Start, stop or check a replay of a recorded session"""
+    if request.method == 'GET':
+        with _replay_lock:
+            return jsonify(dict(_replay_status))
+
+    if request.method == 'DELETE':
+        _replay_stop.set()
+        return jsonify({'stopping': True})
+
+    if not QUOTE_TAPE_DIR:
+        return jsonify({'error': 'Quote tape recording is disabled'}), 404
+
+    payload = request.get_json(silent=True) or {}
+    day = str(payload.get('date', ''))
+    try:
+        speed = float(payload.get('speed', 1))
+    except (TypeError, ValueError):
+        speed = math.nan
+
+    if not re.fullmatch(r'\d{8}', day):
+        return jsonify({'error': 'Date must be YYYYMMDD'}), 400
+    if not (math.isfinite(speed) and speed > 0):
+        return jsonify({'error': 'Speed must be a positive number'}), 400
+    if read_tape(day) is None:
+        return jsonify({'error': f'No quotes recorded on {day}'}), 404
+
+    with _replay_lock:
+        if _replay_status['running']:
+            return jsonify({'error': 'A replay is already running'}), 409
+
+        _replay_stop.clear()
+        _replay_status.clear()
+        _replay_status.update({
+            'running': True,
+            'date': day,
+            'speed': speed,
+            'ticks': 0,
+            'quotes': 0,
+            'alertsFired': 0,
+            'maxLagMs': 0.0,
+            'startedAt': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        })
+
+    threading.Thread(target=replay_tape, args=(day, speed), name='tape-replay', daemon=True).start()
+
+    return jsonify(dict(_replay_status)), 202
+
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0', port=8000)
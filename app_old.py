@@ -239,7 +239,6 @@ FALLBACK_STOCKS = [
     {'symbol': 'NETWEB.NS', 'name': 'Netweb Technologies'},
 
     # Recently Listed & New Age
-    {'symbol': 'TATATECH.NS', 'name': 'Tata Technologies'},
     {'symbol': 'IDEAFORGE.NS', 'name': 'IdeaForge Technology'},
     {'symbol': 'JYOTHYLAB.NS', 'name': 'Jyothy Labs'},
     {'symbol': 'POONAWALLA.NS', 'name': 'Poonawalla Fincorp'},
@@ -252,7 +251,7 @@ FALLBACK_STOCKS = [
     {'symbol': 'SAPPHIRE.NS', 'name': 'Sapphire Foods'},
     {'symbol': 'MEDPLUS.NS', 'name': 'MedPlus Health'},
     {'symbol': 'RAINBOW.NS', 'name': 'Rainbow Childrens Hospital'},
-    {'symbol': 'Krishna.NS', 'name': 'Krishna Institute of Medical Sciences'},
+    {'symbol': 'KIMS.NS', 'name': 'Krishna Institute of Medical Sciences'},
     {'symbol': 'YATRA.NS', 'name': 'Yatra Online'},
     {'symbol': 'METROPOLIS.NS', 'name': 'Metropolis Healthcare'},
     {'symbol': 'THYROCARE.NS', 'name': 'Thyrocare Technologies'},
@@ -293,10 +292,8 @@ FALLBACK_STOCKS = [
     # Metals & Steel
     {'symbol': 'JINDALSTEL.NS', 'name': 'Jindal Steel & Power'},
     {'symbol': 'JSWENERGY.NS', 'name': 'JSW Energy'},
-    {'symbol': 'SAIL.NS', 'name': 'SAIL'},
     {'symbol': 'RATNAMANI.NS', 'name': 'Ratnamani Metals'},
     {'symbol': 'KALYANKJIL.NS', 'name': 'Kalyan Jewellers'},
-    {'symbol': 'TITAN.NS', 'name': 'Titan Company'},
 
     # Chemicals & Fertilizers
     {'symbol': 'PIIND.NS', 'name': 'PI Industries'},
@@ -329,7 +326,6 @@ FALLBACK_STOCKS = [
 
     # Food & Beverages
     {'symbol': 'VARUN.NS', 'name': 'Varun Beverages'},
-    {'symbol': 'TATACONSUM.NS', 'name': 'Tata Consumer'},
     {'symbol': 'MARICO.NS', 'name': 'Marico'},
     {'symbol': 'DABUR.NS', 'name': 'Dabur India'},
     {'symbol': 'EMAMI.NS', 'name': 'Emami'},
@@ -369,7 +365,6 @@ FALLBACK_STOCKS = [
     {'symbol': 'SUZLON.NS', 'name': 'Suzlon Energy'},
     {'symbol': 'WEBELSOLAR.NS', 'name': 'Websol Energy'},
     {'symbol': 'RPOWER.NS', 'name': 'Reliance Power'},
-    {'symbol': 'JSWENERGY.NS', 'name': 'JSW Energy'},
     {'symbol': 'NHPC.NS', 'name': 'NHPC'},
     {'symbol': 'SJVN.NS', 'name': 'SJVN'},
     {'symbol': 'GUJALKALI.NS', 'name': 'Gujarat Alkalies'},
@@ -377,7 +372,6 @@ FALLBACK_STOCKS = [
     # E-commerce & Digital
     {'symbol': 'FSL.NS', 'name': 'Firstsource Solutions'},
     {'symbol': 'INTELLECT.NS', 'name': 'Intellect Design Arena'},
-    {'symbol': 'RAMCOCEM.NS', 'name': 'Ramco Cements'},
     {'symbol': 'DELTACORP.NS', 'name': 'Delta Corp'},
 
     # Defense & Aerospace
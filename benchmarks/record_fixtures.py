@@ -0,0 +1,133 @@
+"""Record yfinance responses used by the benchmark suite.
+
+By default this fetches live data from Yahoo Finance. Pass --synthetic to
+generate deterministic fixtures with the same shape when offline, so runs on
+different machines and commits use identical inputs.
+
+    python benchmarks/record_fixtures.py
+    python benchmarks/record_fixtures.py --synthetic
+"""
+import argparse
+import json
+import os
+import sys
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import DEFAULT_SYMBOLS, HISTORY_PERIODS
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+# Symbol whose history is recorded for every chart period
+HISTORY_SYMBOL = 'RELIANCE.NS'
+
+# Bars per chart period for synthetic fixtures, roughly what Yahoo returns
+SYNTHETIC_BARS = {
+    '1d': ('5min', 75),
+    '1w': ('30min', 65),
+    '1m': ('B', 21),
+    '3m': ('B', 63),
+    '6m': ('B', 126),
+    '1y': ('B', 248),
+    '5y': ('W-MON', 260),
+    'max': ('MS', 360)
+}
+
+def record_live():
+    import yfinance as yf
+
+    ticker = yf.Ticker(HISTORY_SYMBOL)
+    histories = {period: ticker.history(**params) for period, params in HISTORY_PERIODS.items()}
+    infos = {symbol: yf.Ticker(symbol).info for symbol in DEFAULT_SYMBOLS}
+
+    return histories, infos
+
+def record_synthetic(seed=0):
+    rng = np.random.default_rng(seed)
+    histories = {}
+
+    for period, (freq, bars) in SYNTHETIC_BARS.items():
+        start = '2025-06-02 09:15' if freq.endswith('min') else '1995-01-02'
+        index = pd.date_range(start, periods=bars, freq=freq, tz='Asia/Kolkata')
+        close = 2500 * np.exp(np.cumsum(rng.normal(0, 0.01, bars)))
+        open_ = close * (1 + rng.normal(0, 0.003, bars))
+
+        histories[period] = pd.DataFrame({
+            'Open': open_,
+            'High': np.maximum(open_, close) * (1 + rng.uniform(0, 0.01, bars)),
+            'Low': np.minimum(open_, close) * (1 - rng.uniform(0, 0.01, bars)),
+            'Close': close,
+            'Volume': rng.integers(10_000, 5_000_000, bars).astype(np.int64),
+            'Dividends': 0.0,
+            'Stock Splits': 0.0
+        }, index=pd.DatetimeIndex(index, name='Date'))
+
+    infos = {}
+    for symbol in DEFAULT_SYMBOLS:
+        previous_close = float(rng.uniform(100, 5000))
+        price = previous_close * (1 + rng.normal(0, 0.02))
+        infos[symbol] = {
+            'symbol': symbol,
+            'longName': symbol.split('.')[0].title(),
+            'currentPrice': price,
+            'regularMarketPrice': price,
+            'previousClose': previous_close,
+            'open': previous_close * (1 + rng.normal(0, 0.005)),
+            'dayHigh': price * 1.01,
+            'dayLow': price * 0.99,
+            'volume': int(rng.integers(100_000, 20_000_000)),
+            'marketCap': int(rng.integers(10**11, 2 * 10**13)),
+            'fiftyTwoWeekHigh': price * 1.3,
+            'fiftyTwoWeekLow': price * 0.7,
+            'currency': 'INR',
+            'exchange': 'NSI'
+        }
+
+    return histories, infos
+
+def save(histories, infos, source, out_dir=FIXTURES_DIR):
+    os.makedirs(os.path.join(out_dir, 'history'), exist_ok=True)
+
+    for period, hist in histories.items():
+        hist.to_pickle(os.path.join(out_dir, 'history', f'{period}.pkl'))
+
+    with open(os.path.join(out_dir, 'info.json'), 'w') as f:
+        json.dump(infos, f, indent=2, default=str)
+
+    with open(os.path.join(out_dir, 'meta.json'), 'w') as f:
+        json.dump({
+            'source': source,
+            'symbol': HISTORY_SYMBOL,
+            'recordedAt': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        }, f, indent=2)
+
+def load(fixtures_dir=FIXTURES_DIR):
+    """Load recorded fixtures as ({period: DataFrame}, {symbol: info})"""
+    histories = {
+        period: pd.read_pickle(os.path.join(fixtures_dir, 'history', f'{period}.pkl'))
+        for period in HISTORY_PERIODS
+    }
+
+    with open(os.path.join(fixtures_dir, 'info.json')) as f:
+        infos = json.load(f)
+
+    return histories, infos
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--synthetic', action='store_true', help='generate deterministic data instead of calling Yahoo Finance')
+    parser.add_argument('--seed', type=int, default=0, help='random seed for --synthetic')
+    parser.add_argument('--out', default=FIXTURES_DIR, help='fixtures directory')
+    args = parser.parse_args()
+
+    if args.synthetic:
+        histories, infos = record_synthetic(args.seed)
+    else:
+        histories, infos = record_live()
+
+    save(histories, infos, 'synthetic' if args.synthetic else 'yahoo', args.out)
+    print(f"Saved {len(histories)} histories and {len(infos)} info dicts to {args.out}")
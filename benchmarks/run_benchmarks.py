@@ -0,0 +1,183 @@
+"""Microbenchmarks for the app's CPU hot paths, run offline from recorded fixtures.
+
+Upstream calls are answered from the fixtures recorded by record_fixtures.py,
+so only the app's own work is measured. Results are written as JSON and can be
+compared against an earlier run to catch regressions between commits.
+
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --compare benchmarks/results/abc1234.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+import app
+from record_fixtures import FIXTURES_DIR, load
+
+RESULTS_DIR = os.path.join(BENCH_DIR, 'results')
+
+# Queries for the fallback search scan: prefix hits, name hits and a full miss
+SEARCH_QUERIES = ['TATA', 'bank', 'zzz']
+
+def git_revision():
+    try:
+        revision = subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT_DIR, text=True).strip()
+        dirty = subprocess.check_output(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=ROOT_DIR, text=True).strip()
+        return revision + ('-dirty' if dirty else '')
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+def measure(fn, repeat=7, min_sample_time=0.02):
+    """Time fn, calibrating the loop count so each sample runs at least min_sample_time"""
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_sample_time:
+            break
+        number *= 2
+
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - start) / number * 1e6)
+
+    return {
+        'median_us': round(statistics.median(samples), 3),
+        'min_us': round(min(samples), 3),
+        'mean_us': round(statistics.mean(samples), 3),
+        'stdev_us': round(statistics.stdev(samples), 3) if len(samples) > 1 else 0.0,
+        'loops': number,
+        'repeat': repeat
+    }
+
+def install_fixtures(histories, infos):
+    """Point the app's upstream fetchers at the recorded fixtures"""
+    periods = {params['period']: period for period, params in app.HISTORY_PERIODS.items()}
+    default_info = next(iter(infos.values()))
+
+    app.fetch_info = lambda symbol: infos.get(symbol, default_info)
+    app.fetch_history = lambda symbol, timeout, period, interval: histories[periods[period]]
+    app.search_yahoo_finance = lambda query, timeout=5: []
+
+def build_benchmarks(histories, infos):
+    benchmarks = {}
+
+    for period, hist in histories.items():
+        benchmarks[f'history.serialize.{period}'] = lambda hist=hist, period=period: app.serialize_history(hist, period)
+
+    symbols = list(infos)
+    benchmarks['quote.build'] = lambda: [app.build_quote(symbol, infos[symbol]) for symbol in symbols]
+
+    for query in SEARCH_QUERIES:
+        benchmarks[f'search.fallback.{query}'] = lambda query=query: app.search_fallback_stocks(query)
+
+    client = app.app.test_client()
+
+    def get(url):
+        response = client.get(url)
+        assert response.status_code == 200, (url, response.status_code)
+
+    def forget_quotes():
+        for instrument in app._instruments.values():
+            instrument.info = None
+
+    def stock_cold():
+        forget_quotes()
+        get(f'/api/stock/{symbols[0]}')
+
+    def snapshot_cold():
+        app._response_cache.clear()
+        forget_quotes()
+        get('/api/stocks/multiple')
+
+    benchmarks['http.stock.cold'] = stock_cold
+    benchmarks['http.stock.cached'] = lambda: get(f'/api/stock/{symbols[0]}')
+    benchmarks['http.snapshot.cold'] = snapshot_cold
+    benchmarks['http.snapshot.cached'] = lambda: get('/api/stocks/multiple')
+    for period in histories:
+        benchmarks[f'http.history.{period}'] = lambda period=period: get(f'/api/history/{symbols[0]}?period={period}')
+    benchmarks['http.search'] = lambda: get('/api/search/suggestions?q=tata')
+
+    return benchmarks
+
+def compare(results, baseline_path, threshold):
+    """Print the change against a baseline run; return names slower than threshold"""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+
+    print(f"\nCompared with {baseline.get('revision', baseline_path)}:")
+    regressions = []
+    for name, result in results.items():
+        before = baseline['results'].get(name)
+        if not before:
+            print(f"  {name:<28} new")
+            continue
+        ratio = result['median_us'] / before['median_us']
+        flag = '  REGRESSION' if ratio > threshold else ''
+        print(f"  {name:<28} {before['median_us']:>12.1f} -> {result['median_us']:>12.1f} us  x{ratio:.2f}{flag}")
+        if ratio > threshold:
+            regressions.append(name)
+
+    return regressions
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--fixtures', default=FIXTURES_DIR, help='fixtures directory')
+    parser.add_argument('--filter', default='', help='only run benchmarks whose name contains this')
+    parser.add_argument('--repeat', type=int, default=7, help='samples per benchmark')
+    parser.add_argument('--out', help='results file (default: benchmarks/results/<revision>.json)')
+    parser.add_argument('--compare', help='earlier results file to compare against')
+    parser.add_argument('--threshold', type=float, default=1.2, help='slowdown ratio reported as a regression')
+    args = parser.parse_args()
+
+    if not os.path.exists(os.path.join(args.fixtures, 'meta.json')):
+        sys.exit(f"No fixtures in {args.fixtures}. Run: python benchmarks/record_fixtures.py [--synthetic]")
+
+    histories, infos = load(args.fixtures)
+    with open(os.path.join(args.fixtures, 'meta.json')) as f:
+        fixtures_meta = json.load(f)
+
+    install_fixtures(histories, infos)
+    benchmarks = build_benchmarks(histories, infos)
+
+    results = {}
+    for name, fn in benchmarks.items():
+        if args.filter not in name:
+            continue
+        results[name] = measure(fn, repeat=args.repeat)
+        print(f"{name:<30} {results[name]['median_us']:>12.1f} us  (min {results[name]['min_us']:.1f}, {results[name]['loops']} loops)")
+
+    revision = git_revision()
+    report = {
+        'revision': revision,
+        'createdAt': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'fixtures': fixtures_meta,
+        'results': results
+    }
+
+    out = args.out or os.path.join(RESULTS_DIR, f'{revision}.json')
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nSaved results to {out}")
+
+    if args.compare and compare(results, args.compare, args.threshold):
+        sys.exit(1)